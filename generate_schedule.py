@@ -1,19 +1,51 @@
 import json
 import argparse
 import datetime as dt
+from typing import List, Optional
 from zoneinfo import ZoneInfo
-from PIL import Image, ImageDraw, ImageFont
-from schedule.models import SchedulePreset
+from PIL import Image
+from schedule.models import Keyframe, SchedulePreset
+from schedule.render import draw_telop
+from schedule.animate import render_animation, stagger_in
 
 def load_preset(path: str) -> SchedulePreset:
     with open(path, "r", encoding="utf-8") as f:
         data = json.load(f)
     return SchedulePreset.from_dict(data)
 
+def load_keyframes(path: str) -> List[List[Keyframe]]:
+    # [[{"t": 0.0, "dy": 40, "alpha": 0.0}, {"t": 0.5}], ...] の形式（曜日ごと）
+    with open(path, "r", encoding="utf-8") as f:
+        data = json.load(f)
+    return [[Keyframe(**k) for k in keys] for keys in data]
+
+def week_texts(monday: dt.date, lines: List[str]) -> List[str]:
+    ja = ["月", "火", "水", "木", "金", "土", "日"]
+    texts = []
+    for i in range(7):
+        d = monday + dt.timedelta(days=i)
+        auto = f"{d.month}/{d.day}（{ja[i]}）"
+        body = lines[i].strip() if i < len(lines) else ""
+        texts.append(auto if not body else f"{auto}\n{body}")
+    return texts
+
+def render_schedule(preset: SchedulePreset, texts: List[str], base: Optional[Image.Image] = None) -> Image.Image:
+    out = Image.open(preset.base_image).convert("RGBA") if base is None else base.copy()
+    for pos, text in zip(preset.positions, texts):
+        draw_telop(out, pos, text, preset.style)
+    return out
+
 def main():
     parser = argparse.ArgumentParser(description="7つのテキストを入力して予定表画像を生成")
     parser.add_argument("preset", help=".vscプリセットファイル")
-    parser.add_argument("output", help="出力画像パス")
+    parser.add_argument("output", help="出力画像パス（--animate 時は .png/.gif/.webp）")
+    parser.add_argument("--animate", action="store_true", help="各曜日を順に表示するアニメーションを書き出す")
+    parser.add_argument("--keyframes", help="曜日ごとのキーフレーム(JSON)。省略時は順番にスライド+フェードイン")
+    parser.add_argument("--fps", type=float, default=20.0, help="フレームレート")
+    parser.add_argument("--stagger", type=float, default=0.25, help="曜日ごとの開始間隔(秒)")
+    parser.add_argument("--fade", type=float, default=0.5, help="フェードイン時間(秒)")
+    parser.add_argument("--slide", type=int, default=40, help="スライドインの移動量(px、下から)")
+    parser.add_argument("--hold", type=float, default=2.0, help="出揃ってから止めておく時間(秒)")
     args = parser.parse_args()
 
     preset = load_preset(args.preset)
@@ -26,28 +58,17 @@ def main():
     tz = ZoneInfo("Asia/Tokyo")
     today = dt.datetime.now(tz).date()
     monday = today - dt.timedelta(days=today.weekday())
-    ja = ["月", "火", "水", "木", "金", "土", "日"]
+    texts = week_texts(monday, lines)
 
-    base = Image.open(preset.base_image).convert("RGBA")
-    draw = ImageDraw.Draw(base)
-    font = ImageFont.truetype(preset.style.font_path, preset.style.font_size)
-    for i, pos in enumerate(preset.positions):
-        d = monday + dt.timedelta(days=i)
-        auto = f"{d.month}/{d.day}（{ja[i]}）"
-        body = lines[i].strip()
-        text = auto if not body else f"{auto}\n{body}"
-        draw.multiline_text(
-            pos,
-            text,
-            font=font,
-            fill=preset.style.fill,
-            spacing=preset.style.line_spacing,
-            stroke_width=preset.style.stroke_width,
-            stroke_fill=preset.style.stroke_fill,
-            align="left",
-            anchor="lt",
-        )
-    base.save(args.output)
+    if args.animate:
+        if args.keyframes:
+            keyframes = load_keyframes(args.keyframes)
+        else:
+            keyframes = stagger_in(len(texts), stagger=args.stagger, fade=args.fade, slide=(0, args.slide))
+        n = render_animation(preset, texts, keyframes, args.output, fps=args.fps, hold=args.hold)
+        print("saved", args.output, f"({n} frames)")
+        return
+    render_schedule(preset, texts).save(args.output)
     print("saved", args.output)
 
 if __name__ == "__main__":
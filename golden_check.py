@@ -0,0 +1,258 @@
+import os
+import sys
+import json
+import argparse
+import datetime as dt
+import hashlib
+import itertools
+import tempfile
+from multiprocessing import Pool
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+from PIL import Image
+
+from generate_schedule import load_preset, render_schedule, week_texts
+from schedule.animate import animation_frames, gif_palette, render_animation, stagger_in
+from schedule.models import SchedulePreset, TelopItem
+from schedule.render import compose_items
+from schedule.shared import SharedAssetStore, SharedImageHandle, render_preset
+
+# 比較する描画経路（参照画像は "generate" で作る。"animate" はアニメーションの最終フレーム）
+PATHS = ("generate", "editor", "shared", "animate")
+# --animations で書き出して読み戻す形式（拡張子 -> 結果の経路名）
+ANIMATION_FORMATS = {".png": "apng", ".gif": "gif", ".webp": "webp"}
+ANIMATION = {"fps": 10, "hold": 0.2}
+
+def load_corpus(path: str) -> List[Tuple[str, str, List[str]]]:
+    """{"presets": [...], "weeks": ["2026-10-19", ...], "texts": [[7行], ...]} の直積を返す"""
+    with open(path, "r", encoding="utf-8") as f:
+        data = json.load(f)
+    root = os.path.dirname(os.path.abspath(path))
+    presets = [os.path.join(root, p) for p in data["presets"]]
+    weeks = data.get("weeks") or [dt.date.today().isoformat()]
+    texts = data.get("texts") or [[]]
+    return list(itertools.product(presets, weeks, texts))
+
+def case_id(preset_path: str, week: str, text_index: int, root: str) -> str:
+    # 別ディレクトリの同名プリセットが同じ参照画像を上書きしないよう、corpus からの相対パスの短いハッシュを付ける
+    stem = os.path.splitext(os.path.basename(preset_path))[0]
+    rel = os.path.relpath(preset_path, root).replace(os.sep, "/")
+    digest = hashlib.sha1(rel.encode("utf-8")).hexdigest()[:8]
+    return f"{stem}-{digest}_{week}_{text_index}"
+
+def diff_stats(actual: Image.Image, expected: Image.Image, tolerance: int) -> Tuple[int, List[int], List[int], np.ndarray]:
+    """(不一致画素数, チャンネル別不一致数, チャンネル別最大差, 画素ごとの最大差) を返す"""
+    a = np.asarray(actual.convert("RGBA"), dtype=np.int16)
+    b = np.asarray(expected.convert("RGBA"), dtype=np.int16)
+    if a.shape != b.shape:
+        h, w = b.shape[:2]
+        return h * w, [h * w] * 4, [255] * 4, np.full((h, w), 255, dtype=np.uint8)
+    d = np.abs(a - b).astype(np.uint8)
+    over = d > tolerance
+    mismatches = int(np.count_nonzero(over.any(axis=2)))
+    per_channel = np.count_nonzero(over, axis=(0, 1)).tolist()
+    max_diff = d.max(axis=(0, 1)).tolist()
+    return mismatches, per_channel, max_diff, d.max(axis=2)
+
+def save_heatmap(path: str, expected: Image.Image, dmax: np.ndarray) -> None:
+    # 参照画像を暗いグレーにして、差分の大きさを赤で重ねる
+    gray = np.asarray(expected.convert("L"), dtype=np.uint16) // 4
+    if gray.shape != dmax.shape:
+        gray = np.zeros(dmax.shape, dtype=np.uint16)
+    peak = max(1, int(dmax.max()))
+    heat = (dmax.astype(np.uint16) * 255 // peak).astype(np.uint8)
+    g = gray.astype(np.uint8)
+    Image.fromarray(np.dstack([np.maximum(heat, g), g, g]), "RGB").save(path)
+
+def load_case_preset(path: str) -> SchedulePreset:
+    """プリセットを読み、相対パスの base_image をプリセットファイルのディレクトリ基準に直す"""
+    preset = load_preset(path)
+    if preset.base_image and not os.path.isabs(preset.base_image):
+        preset.base_image = os.path.join(os.path.dirname(os.path.abspath(path)), preset.base_image)
+    return preset
+
+def _failure(cid: str, path: str, error: str) -> Dict:
+    return {"case": cid, "path": path, "status": "fail", "error": error}
+
+_handles: Dict[str, SharedImageHandle] = {}
+_presets: Dict[str, SchedulePreset] = {}
+
+def _init_worker(handles: Dict[str, SharedImageHandle]) -> None:
+    global _handles
+    _handles = handles
+
+def _load(preset_path: str) -> Tuple[SchedulePreset, SharedImageHandle]:
+    preset = _presets.get(preset_path)
+    if preset is None:
+        preset = _presets[preset_path] = load_case_preset(preset_path)
+    return preset, _handles[preset_path]
+
+def _frames(preset: SchedulePreset, texts: List[str], handle: SharedImageHandle):
+    keyframes = stagger_in(len(texts), stagger=0.1, fade=0.2)
+    return animation_frames(preset, texts, keyframes, base=handle.open_view(), **ANIMATION)
+
+def _render(path: str, preset_path: str, texts: List[str]) -> Image.Image:
+    preset, handle = _load(preset_path)
+    if path == "generate":
+        return render_schedule(preset, texts, base=handle.open_view())
+    if path == "editor":
+        items = [TelopItem(text=t, pos=p, auto_pos=p) for p, t in zip(preset.positions, texts)]
+        return compose_items(handle.open_view(), items, preset.style)
+    if path == "animate":
+        frame = None
+        for frame in _frames(preset, texts, handle):
+            pass
+        return frame
+    return render_preset(handle, preset, texts)
+
+def _check_animation(cid: str, ext: str, preset_path: str, texts: List[str], tolerance: int,
+                     max_mismatch: int) -> Dict:
+    """書き出したアニメーションを読み戻し、各フレームを合成結果と比べる（不一致数は最悪のフレーム）"""
+    preset, handle = _load(preset_path)
+    keyframes = stagger_in(len(texts), stagger=0.1, fade=0.2)
+    palette = None
+    if ext == ".gif":
+        # GIF は書き出し時と同じ共通パレットで減色したものが期待値
+        frame = None
+        for frame in _frames(preset, texts, handle):
+            pass
+        palette = gif_palette(frame)
+    mismatches, per_channel, max_diff = 0, [0] * 4, [0] * 4
+    with tempfile.TemporaryDirectory() as tmp:
+        out = os.path.join(tmp, "anim" + ext)
+        n_frames = render_animation(preset, texts, keyframes, out, base=handle.open_view(), **ANIMATION)
+        try:
+            decoded = Image.open(out)
+        except OSError as e:
+            # 読み戻せないファイルは不一致として報告する
+            return _failure(cid, ANIMATION_FORMATS[ext], str(e))
+        with decoded:
+            count = getattr(decoded, "n_frames", 1)
+            for index, frame in enumerate(_frames(preset, texts, handle)):
+                if index >= count:
+                    break
+                decoded.seek(index)
+                if palette is not None:
+                    frame = frame.convert("RGB").quantize(palette=palette, dither=Image.Dither.NONE)
+                m, pc, md, _dmax = diff_stats(decoded, frame, tolerance)
+                mismatches = max(mismatches, m)
+                per_channel = [max(a, b) for a, b in zip(per_channel, pc)]
+                max_diff = [max(a, b) for a, b in zip(max_diff, md)]
+    ok = count == n_frames and mismatches <= max_mismatch
+    return {
+        "case": cid,
+        "path": ANIMATION_FORMATS[ext],
+        "status": "ok" if ok else "fail",
+        "mismatches": mismatches,
+        "per_channel": per_channel,
+        "max_diff": max_diff,
+        "frames": [count, n_frames],
+    }
+
+def _check_case(job: Tuple) -> List[Dict]:
+    cid, preset_path, week, lines, ref_dir, heatmap_dir, tolerance, max_mismatch, update, animations, error = job
+    if error:
+        return [_failure(cid, p, error) for p in (("generate",) if update else PATHS)]
+    day = dt.date.fromisoformat(week)
+    texts = week_texts(day - dt.timedelta(days=day.weekday()), lines)
+    ref_path = os.path.join(ref_dir, f"{cid}.png")
+    if update:
+        try:
+            _render("generate", preset_path, texts).save(ref_path)
+        except Exception as e:
+            return [_failure(cid, "generate", f"{type(e).__name__}: {e}")]
+        return [{"case": cid, "path": "generate", "status": "updated"}]
+    if not os.path.exists(ref_path):
+        return [{"case": cid, "path": p, "status": "missing"} for p in PATHS]
+    expected = Image.open(ref_path).convert("RGBA")
+    results = []
+    for path in PATHS:
+        try:
+            actual = _render(path, preset_path, texts)
+        except Exception as e:
+            # フォントが読めない等で描けない経路は、落とさずに失敗として数える
+            results.append(_failure(cid, path, f"{type(e).__name__}: {e}"))
+            continue
+        mismatches, per_channel, max_diff, dmax = diff_stats(actual, expected, tolerance)
+        ok = mismatches <= max_mismatch
+        if not ok and heatmap_dir:
+            save_heatmap(os.path.join(heatmap_dir, f"{cid}_{path}.png"), expected, dmax)
+        results.append({
+            "case": cid,
+            "path": path,
+            "status": "ok" if ok else "fail",
+            "mismatches": mismatches,
+            "per_channel": per_channel,
+            "max_diff": max_diff,
+        })
+    if animations:
+        for ext in ANIMATION_FORMATS:
+            try:
+                results.append(_check_animation(cid, ext, preset_path, texts, tolerance, max_mismatch))
+            except Exception as e:
+                results.append(_failure(cid, ANIMATION_FORMATS[ext], f"{type(e).__name__}: {e}"))
+    return results
+
+def run(corpus: str, ref_dir: str, tolerance: int = 0, max_mismatch: int = 0, heatmap_dir: Optional[str] = None,
+        update: bool = False, processes: Optional[int] = None, animations: bool = False) -> List[Dict]:
+    cases = load_corpus(corpus)
+    root = os.path.dirname(os.path.abspath(corpus))
+    os.makedirs(ref_dir, exist_ok=True)
+    if heatmap_dir:
+        os.makedirs(heatmap_dir, exist_ok=True)
+    # ベース画像はプリセットごとに一度だけデコードし、ワーカーは共有メモリを参照する
+    with SharedAssetStore() as store:
+        handles: Dict[str, SharedImageHandle] = {}
+        errors: Dict[str, str] = {}
+        for preset_path in sorted({c[0] for c in cases}):
+            try:
+                handles[preset_path] = store.publish_preset(load_case_preset(preset_path))
+            except (OSError, ValueError, KeyError, TypeError) as e:
+                # 読めないプリセット/ベース画像は、そのプリセットの全ケースの失敗として報告する
+                errors[preset_path] = f"{type(e).__name__}: {e}"
+        counters: Dict[Tuple[str, str], int] = {}
+        jobs = []
+        for preset_path, week, lines in cases:
+            key = (preset_path, week)
+            index = counters.get(key, 0)
+            counters[key] = index + 1
+            jobs.append((case_id(preset_path, week, index, root), preset_path, week, lines, ref_dir, heatmap_dir,
+                         tolerance, max_mismatch, update, animations, errors.get(preset_path)))
+        with Pool(processes, initializer=_init_worker, initargs=(handles,)) as pool:
+            return [r for rs in pool.imap(_check_case, jobs) for r in rs]
+
+def main():
+    parser = argparse.ArgumentParser(description="描画結果を参照画像と比較する（最適化前後の同一性検証）")
+    parser.add_argument("corpus", help="プリセット/週/本文の組を並べたJSON")
+    parser.add_argument("refs", help="参照画像のディレクトリ")
+    parser.add_argument("--update", action="store_true", help="参照画像を現在の描画結果で作り直す")
+    parser.add_argument("--tolerance", type=int, default=0, help="チャンネルごとに許容する差(0-255)")
+    parser.add_argument("--max-mismatch", type=int, default=0, help="許容する不一致画素数")
+    parser.add_argument("--heatmaps", help="不一致時に差分ヒートマップを書き出すディレクトリ")
+    parser.add_argument("-j", "--jobs", type=int, default=None, help="並列プロセス数（既定: CPU数）")
+    parser.add_argument("--animations", action="store_true",
+                        help="APNG/GIF/WebP に書き出して読み戻し、各フレームを合成結果と比べる")
+    parser.add_argument("--report", help="結果をJSONで書き出すパス")
+    args = parser.parse_args()
+
+    results = run(args.corpus, args.refs, args.tolerance, args.max_mismatch, args.heatmaps,
+                  args.update, args.jobs, args.animations)
+    for r in results:
+        if "error" in r:
+            print(f"{r['status'].upper():4} {r['case']} [{r['path']}] error={r['error']}")
+        elif r["status"] in ("ok", "fail"):
+            print(f"{r['status'].upper():4} {r['case']} [{r['path']}] "
+                  f"mismatches={r['mismatches']} per_channel={r['per_channel']} max_diff={r['max_diff']}"
+                  + (f" frames={r['frames'][0]}/{r['frames'][1]}" if "frames" in r else ""))
+        else:
+            print(f"{r['status'].upper():4} {r['case']} [{r['path']}]")
+    if args.report:
+        with open(args.report, "w", encoding="utf-8") as f:
+            json.dump(results, f, ensure_ascii=False, indent=2)
+    failed = [r for r in results if r["status"] in ("fail", "missing")]
+    print(f"{len(results) - len(failed)}/{len(results)} passed")
+    sys.exit(1 if failed else 0)
+
+if __name__ == "__main__":
+    main()
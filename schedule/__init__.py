@@ -13,6 +13,14 @@ if platform.system() == "Windows":
 
 from .fontdb import FontDB
 from .models import TelopStyle, TelopItem, SchedulePreset
-from .editor import TelopEditor
+
+
+def __getattr__(name):
+    # エディタ(tkinter)は使うときに読み込む。描画だけを使うスクリプトやワーカーでは読み込まない
+    if name == "TelopEditor":
+        from .editor import TelopEditor
+        return TelopEditor
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
 
 __all__ = ["FontDB", "TelopStyle", "TelopItem", "SchedulePreset", "TelopEditor"]
@@ -0,0 +1,349 @@
+"""プリセットからアニメーション(APNG/GIF/WebP)を書き出す
+
+各テロップは一度だけレイヤーに描き、フレームはキャッシュしたレイヤーを
+ずらし/透過して合成するだけで作る。フレームは1枚ずつエンコーダへ渡すため、
+長いアニメーションでも全フレームをメモリに保持しない。
+
+各形式のコンテナ(APNG の fcTL/fdAT、GIF の画像ブロック、WebP の ANMF)はここで組み立て、
+Pillow には変化した矩形を単一フレームの PNG/GIF/WebP として保存させるだけにしている。
+"""
+import io
+import os
+import struct
+import zlib
+from typing import Optional, Tuple, List, Dict, Sequence, BinaryIO, Iterator
+
+from PIL import Image
+
+from .models import Keyframe, SchedulePreset
+from .render import Box, composite_at, flatten_parts, telop_parts
+
+State = Tuple[int, int, int]  # (dx, dy, alpha 0-255)
+Layer = Tuple[Image.Image, Tuple[int, int]]  # (レイヤー, 描画位置からのオフセット)
+
+
+def stagger_in(count: int, start: float = 0.0, stagger: float = 0.25, fade: float = 0.5,
+               slide: Tuple[int, int] = (0, 40)) -> List[List[Keyframe]]:
+    """各テロップを順番にスライド+フェードインさせるキーフレーム"""
+    frames = []
+    for i in range(count):
+        t0 = start + i * stagger
+        frames.append([
+            Keyframe(t=t0, dx=slide[0], dy=slide[1], alpha=0.0),
+            Keyframe(t=t0 + fade),
+        ])
+    return frames
+
+
+def _state_at(keys: Sequence[Keyframe], t: float) -> State:
+    if not keys:
+        return 0, 0, 255
+    if t <= keys[0].t:
+        k = keys[0]
+        return k.dx, k.dy, _alpha255(k.alpha)
+    for a, b in zip(keys, keys[1:]):
+        if t <= b.t:
+            r = (t - a.t) / (b.t - a.t) if b.t > a.t else 1.0
+            return (
+                int(round(a.dx + (b.dx - a.dx) * r)),
+                int(round(a.dy + (b.dy - a.dy) * r)),
+                _alpha255(a.alpha + (b.alpha - a.alpha) * r),
+            )
+    k = keys[-1]
+    return k.dx, k.dy, _alpha255(k.alpha)
+
+
+def _alpha255(a: float) -> int:
+    return max(0, min(255, int(round(a * 255))))
+
+
+def _union(a: Optional[Box], b: Optional[Box]) -> Optional[Box]:
+    if a is None:
+        return b
+    if b is None:
+        return a
+    return min(a[0], b[0]), min(a[1], b[1]), max(a[2], b[2]), max(a[3], b[3])
+
+
+class _Compositor:
+    """背景とキャッシュ済みレイヤーから、変化した矩形だけを描き直してフレームを作る
+
+    不透明な間は光彩/影/文字のレイヤーを draw_telop と同じ順に重ねるので、静止画と一致する。
+    フェード中だけは重ね済みの1枚に透明度を掛けて合成する。
+    """
+
+    def __init__(self, base: Image.Image, parts: List[List[Layer]],
+                 positions: Sequence[Tuple[int, int]], keyframes: Sequence[Sequence[Keyframe]], fps: float):
+        self.base = base
+        self.parts = parts
+        self.layers = [flatten_parts(p) for p in parts]
+        self.positions = positions
+        self.keyframes = keyframes
+        self.fps = fps
+        self.canvas = base.copy()
+        self._index = -1
+        self._states: List[State] = []
+        self._faded: Dict[Tuple[int, int], Image.Image] = {}
+
+    def states(self, index: int) -> List[State]:
+        t = index / self.fps
+        return [_state_at(self.keyframes[i] if i < len(self.keyframes) else (), t)
+                for i in range(len(self.layers))]
+
+    def _rect(self, i: int, st: State) -> Optional[Box]:
+        if st[2] == 0:
+            return None
+        layer, (lx, ly) = self.layers[i]
+        x = self.positions[i][0] + lx + st[0]
+        y = self.positions[i][1] + ly + st[1]
+        return x, y, x + layer.width, y + layer.height
+
+    def _layer(self, i: int, alpha: int) -> Image.Image:
+        layer = self.layers[i][0]
+        if alpha >= 255:
+            return layer
+        key = (i, alpha)
+        faded = self._faded.get(key)
+        if faded is None:
+            # 同じ透明度はフェード中に何度も使われないので直前の数枚だけ持つ
+            if len(self._faded) > 4 * len(self.layers):
+                self._faded.clear()
+            faded = layer.copy()
+            faded.putalpha(layer.getchannel("A").point([v * alpha // 255 for v in range(256)]))
+            self._faded[key] = faded
+        return faded
+
+    def _redraw(self, box: Box, states: List[State]) -> None:
+        x0, y0, x1, y1 = box
+        patch = self.base.crop(box)
+        for i, st in enumerate(states):
+            rect = self._rect(i, st)
+            if rect is None or rect[2] <= x0 or rect[0] >= x1 or rect[3] <= y0 or rect[1] >= y1:
+                continue
+            if st[2] >= 255:
+                # rect は重ね済みレイヤーの左上なので、各レイヤーの位置はそこからの差で求める
+                fx, fy = self.layers[i][1]
+                for layer, (lx, ly) in self.parts[i]:
+                    composite_at(patch, layer, rect[0] + lx - fx - x0, rect[1] + ly - fy - y0)
+            else:
+                composite_at(patch, self._layer(i, st[2]), rect[0] - x0, rect[1] - y0)
+        self.canvas.paste(patch, (x0, y0))
+
+    def render(self, index: int) -> Optional[Box]:
+        """index のフレームを canvas に描き、前フレームから変化した矩形を返す(変化なしは None)"""
+        states = self.states(index)
+        full = (0, 0) + self.canvas.size
+        if index != self._index + 1 or not self._states:
+            dirty: Optional[Box] = full
+        else:
+            dirty = None
+            for i, (old, new) in enumerate(zip(self._states, states)):
+                if old != new:
+                    dirty = _union(dirty, _union(self._rect(i, old), self._rect(i, new)))
+        self._index, self._states = index, states
+        if dirty is None:
+            return None
+        dirty = (max(0, dirty[0]), max(0, dirty[1]), min(full[2], dirty[2]), min(full[3], dirty[3]))
+        if dirty[2] <= dirty[0] or dirty[3] <= dirty[1]:
+            return None
+        self._redraw(dirty, states)
+        return dirty
+
+
+def _png_chunks(data: bytes):
+    pos = 8
+    while pos < len(data):
+        (length,) = struct.unpack(">I", data[pos:pos + 4])
+        yield data[pos + 4:pos + 8], data[pos + 8:pos + 8 + length]
+        pos += 12 + length
+
+
+def _write_chunk(fp: BinaryIO, ctype: bytes, body: bytes) -> None:
+    fp.write(struct.pack(">I", len(body)) + ctype + body)
+    fp.write(struct.pack(">I", zlib.crc32(ctype + body) & 0xFFFFFFFF))
+
+
+def _write_apng(fp: BinaryIO, comp: _Compositor, n_frames: int, duration_ms: int, loop: int) -> None:
+    # 2フレーム目以降は変化した矩形だけを fcTL/fdAT として書く
+    seq = 0
+    for index in range(n_frames):
+        dirty = comp.render(index)
+        if index == 0:
+            dirty = (0, 0) + comp.canvas.size
+        elif dirty is None:
+            dirty = (0, 0, 1, 1)  # 変化なし: 同じ1pxを上書きして尺だけ進める
+        buf = io.BytesIO()
+        comp.canvas.crop(dirty).save(buf, "PNG", compress_level=6)
+        chunks = list(_png_chunks(buf.getvalue()))
+        if index == 0:
+            fp.write(b"\x89PNG\r\n\x1a\n")
+            _write_chunk(fp, b"IHDR", dict(chunks)[b"IHDR"])
+            _write_chunk(fp, b"acTL", struct.pack(">II", n_frames, loop))
+        x0, y0, x1, y1 = dirty
+        _write_chunk(fp, b"fcTL", struct.pack(">IIIIIHHBB", seq, x1 - x0, y1 - y0, x0, y0,
+                                              duration_ms, 1000, 0, 0))
+        seq += 1
+        for ctype, body in chunks:
+            if ctype != b"IDAT":
+                continue
+            if index == 0:
+                _write_chunk(fp, b"IDAT", body)
+            else:
+                _write_chunk(fp, b"fdAT", struct.pack(">I", seq) + body)
+                seq += 1
+    _write_chunk(fp, b"IEND", b"")
+
+
+def _gif_image_block(img: Image.Image) -> Tuple[bytearray, bytes]:
+    """単一フレームGIFとして符号化し、GIF89a の構造どおりに (画像記述子, 色表+LZWデータ) を取り出す"""
+    buf = io.BytesIO()
+    img.save(buf, "GIF")
+    data = buf.getvalue()
+    if data[:6] not in (b"GIF87a", b"GIF89a"):
+        raise ValueError("unexpected GIF header")
+    packed = data[10]
+    pos = 13
+    table = b""
+    if packed & 0x80:
+        n = 3 << ((packed & 7) + 1)
+        table = data[pos:pos + n]
+        pos += n
+    while data[pos] == 0x21:  # 拡張ブロックは読み飛ばす
+        pos += 2
+        while data[pos]:
+            pos += data[pos] + 1
+        pos += 1
+    if data[pos] != 0x2C:
+        raise ValueError("GIF image descriptor not found")
+    desc = bytearray(data[pos:pos + 10])
+    pos += 10
+    start = pos
+    if desc[9] & 0x80:
+        pos += 3 << ((desc[9] & 7) + 1)  # 局所色表はそのまま使う
+        table = b""
+    elif table:
+        # 大域色表をこのフレームの局所色表として付け替える
+        desc[9] |= 0x80 | (packed & 7)
+    pos += 1  # LZW 最小符号長
+    while data[pos]:  # データ副ブロックを終端(0)まで
+        pos += data[pos] + 1
+    pos += 1
+    return desc, table + data[start:pos]
+
+
+def gif_palette(frame: Image.Image) -> Image.Image:
+    """GIF 書き出しで全フレームに使う共通パレット（最終フレームから作る）"""
+    return frame.convert("RGB").quantize(255)
+
+
+def _write_gif(fp: BinaryIO, comp: _Compositor, n_frames: int, duration_ms: int, loop: int) -> None:
+    # 全テロップが出揃った最終フレームから共通パレットを作り、差分矩形ごとの色ずれを防ぐ
+    comp.render(n_frames - 1)
+    palette = gif_palette(comp.canvas)
+    w, h = comp.canvas.size
+    fp.write(b"GIF89a" + struct.pack("<HHBBB", w, h, 0, 0, 0))
+    fp.write(b"!\xff\x0bNETSCAPE2.0\x03\x01" + struct.pack("<H", loop) + b"\x00")
+    delay = max(2, int(round(duration_ms / 10)))
+    for index in range(n_frames):
+        dirty = comp.render(index)
+        if index == 0:
+            dirty = (0, 0, w, h)
+        elif dirty is None:
+            dirty = (0, 0, 1, 1)
+        crop = comp.canvas.crop(dirty).convert("RGB").quantize(palette=palette, dither=Image.Dither.NONE)
+        desc, rest = _gif_image_block(crop)
+        desc[1:5] = struct.pack("<HH", dirty[0], dirty[1])
+        fp.write(b"!\xf9\x04\x04" + struct.pack("<H", delay) + b"\x00\x00")
+        fp.write(bytes(desc) + rest)
+    fp.write(b";")
+
+
+def _u24(v: int) -> bytes:
+    return struct.pack("<I", v)[:3]
+
+
+def _riff_chunks(data: bytes):
+    pos = 12
+    while pos + 8 <= len(data):
+        ctype = data[pos:pos + 4]
+        (length,) = struct.unpack("<I", data[pos + 4:pos + 8])
+        yield ctype, data[pos + 8:pos + 8 + length]
+        pos += 8 + length + (length & 1)
+
+
+def _riff_chunk(ctype: bytes, body: bytes) -> bytes:
+    return ctype + struct.pack("<I", len(body)) + body + (b"\0" if len(body) & 1 else b"")
+
+
+def _write_webp(fp: BinaryIO, comp: _Compositor, n_frames: int, duration_ms: int, loop: int) -> None:
+    # 変化した矩形を単一フレームのロスレスWebPとして符号化し、ANMF チャンクに包んで並べる
+    w, h = comp.canvas.size
+    fp.write(b"RIFF\0\0\0\0WEBP")  # RIFF の大きさは最後に書き戻す
+    fp.write(_riff_chunk(b"VP8X", struct.pack("<B3x", 0x12) + _u24(w - 1) + _u24(h - 1)))  # アルファ+アニメーション
+    fp.write(_riff_chunk(b"ANIM", struct.pack("<IH", 0, loop)))
+    for index in range(n_frames):
+        dirty = comp.render(index)
+        if index == 0:
+            dirty = (0, 0, w, h)
+        elif dirty is None:
+            dirty = (0, 0, 1, 1)
+        # ANMF の位置は偶数座標でしか指定できない
+        x0, y0, x1, y1 = dirty[0] & ~1, dirty[1] & ~1, dirty[2], dirty[3]
+        buf = io.BytesIO()
+        comp.canvas.crop((x0, y0, x1, y1)).save(buf, "WEBP", lossless=True, exact=True)
+        data = buf.getvalue()
+        if data[:4] != b"RIFF" or data[8:12] != b"WEBP":
+            raise ValueError("unexpected WebP container")
+        frame = b"".join(_riff_chunk(c, body) for c, body in _riff_chunks(data) if c in (b"ALPH", b"VP8 ", b"VP8L"))
+        header = _u24(x0 // 2) + _u24(y0 // 2) + _u24(x1 - x0 - 1) + _u24(y1 - y0 - 1) + _u24(duration_ms)
+        fp.write(_riff_chunk(b"ANMF", header + b"\x02" + frame))  # 重ねずに置き換え、破棄なし
+    size = fp.tell() - 8
+    fp.seek(4)
+    fp.write(struct.pack("<I", size))
+    fp.seek(0, os.SEEK_END)
+
+
+def _prepare(preset: SchedulePreset, texts: Sequence[str], keyframes: Sequence[Sequence[Keyframe]], fps: float,
+             duration: Optional[float], hold: float, base: Optional[Image.Image]) -> Tuple[_Compositor, int]:
+    if base is None:
+        base = Image.open(preset.base_image).convert("RGBA")
+    count = min(len(texts), len(preset.positions))
+    parts = [telop_parts(texts[i], preset.style) for i in range(count)]
+    if duration is None:
+        duration = max((k.t for keys in keyframes for k in keys), default=0.0) + hold
+    n_frames = max(1, int(round(duration * fps)))
+    return _Compositor(base, parts, preset.positions[:count], keyframes, fps), n_frames
+
+
+def animation_frames(preset: SchedulePreset, texts: Sequence[str], keyframes: Sequence[Sequence[Keyframe]],
+                     fps: float = 20.0, duration: Optional[float] = None, hold: float = 2.0,
+                     base: Optional[Image.Image] = None) -> Iterator[Image.Image]:
+    """render_animation と同じ手順で各フレームを順に返す（返した画像は次のフレームで書き換わる）"""
+    comp, n_frames = _prepare(preset, texts, keyframes, fps, duration, hold, base)
+    for index in range(n_frames):
+        comp.render(index)
+        yield comp.canvas
+
+
+def render_animation(preset: SchedulePreset, texts: Sequence[str], keyframes: Sequence[Sequence[Keyframe]],
+                     out_path: str, fps: float = 20.0, duration: Optional[float] = None, hold: float = 2.0,
+                     loop: int = 0, base: Optional[Image.Image] = None) -> int:
+    """texts[i] を preset.positions[i] に置いたアニメーションを書き出し、フレーム数を返す
+
+    形式は拡張子で決める（.png/.apng: APNG, .gif: GIF, .webp: WebP）。
+    duration を省略すると、最後のキーフレームから hold 秒止めて終える。
+    """
+    ext = os.path.splitext(out_path)[1].lower()
+    if ext not in (".png", ".apng", ".gif", ".webp"):
+        raise ValueError(f"unsupported animation format: {ext}")
+    comp, n_frames = _prepare(preset, texts, keyframes, fps, duration, hold, base)
+    duration_ms = int(round(1000 / fps))
+
+    with open(out_path, "wb") as fp:
+        if ext == ".gif":
+            _write_gif(fp, comp, n_frames, duration_ms, loop)
+        elif ext == ".webp":
+            _write_webp(fp, comp, n_frames, duration_ms, loop)
+        else:
+            _write_apng(fp, comp, n_frames, duration_ms, loop)
+    return n_frames
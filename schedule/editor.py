@@ -1,13 +1,15 @@
 import tkinter as tk
 from tkinter import filedialog, colorchooser, messagebox, ttk
-from PIL import Image, ImageDraw, ImageFont, ImageTk
-from typing import Optional, Tuple, List
+from PIL import Image, ImageTk
+from typing import Optional, Tuple, List, Dict
 import os
 import datetime as dt
 import json
+from dataclasses import astuple
 
 from .models import TelopStyle, TelopItem, SchedulePreset
 from .fontdb import FontDB
+from .render import LayerCache, compose_items, load_font, render_layer, scaled_metrics, text_bbox
 
 class TelopEditor(tk.Tk):
     def __init__(self):
@@ -25,7 +27,12 @@ class TelopEditor(tk.Tk):
         self.base_image: Optional[Image.Image] = None
         self.base_image_path: Optional[str] = None
         self.preview_image: Optional[ImageTk.PhotoImage] = None
-        self.preview_scale: float = 1.0
+        self.preview_scale: float = 1.0  # 表示倍率（キャンバスpx / 画像px）
+        self.fit_scale: float = 1.0  # 全体表示時の倍率
+        self.view_offset: Tuple[int, int] = (0, 0)  # 画像左上のキャンバス座標
+        self.view_fitted: bool = True  # Trueの間はリサイズ時に全体表示へ追従
+        self._pyramid: Dict[int, Image.Image] = {}  # 縮小率(1/2^k) -> 縮小済みベース画像
+        self._telop_layers = LayerCache(max_bytes=64 << 20)  # プレビュー用テロップレイヤー(倍率 1 以下)
         self.style = TelopStyle()
         self.fontdb = FontDB()
 
@@ -70,6 +77,13 @@ class TelopEditor(tk.Tk):
         self.canvas.bind("<Button-1>", self._on_mouse_down)
         self.canvas.bind("<B1-Motion>", self._on_mouse_drag)
         self.canvas.bind("<ButtonRelease-1>", self._on_mouse_up)
+        # ズーム（ホイール）/パン（中・右ドラッグ）
+        self.canvas.bind("<MouseWheel>", self._on_mouse_wheel)
+        self.canvas.bind("<Button-4>", self._on_mouse_wheel)
+        self.canvas.bind("<Button-5>", self._on_mouse_wheel)
+        for btn in (2, 3):
+            self.canvas.bind(f"<ButtonPress-{btn}>", self._on_pan_start)
+            self.canvas.bind(f"<B{btn}-Motion>", self._on_pan_drag)
 
         # 右: コントロール
         right = tk.Frame(paned, padx=10, pady=10)
@@ -138,7 +152,10 @@ class TelopEditor(tk.Tk):
         frow.pack(fill=tk.X)
         self.family_var = tk.StringVar(value=self.style.family or "")
         fams = self.fontdb.families() or ["(フォントを検出できません)"]
-        self.family_box = ttk.Combobox(frow, values=fams, textvariable=self.family_var, state="readonly", width=26)
+        # 入力した文字でファミリ一覧を絞り込む（前方一致→部分一致）
+        self.family_box = ttk.Combobox(frow, values=fams, textvariable=self.family_var, width=26)
+        self.family_box.bind("<KeyRelease>", self._on_family_typed)
+        self.family_box.bind("<<ComboboxSelected>>", lambda _e: self._refresh())
         self.family_box.pack(side=tk.LEFT, fill=tk.X, expand=True)
         tk.Button(frow, text="更新", command=self._refresh_font_list).pack(side=tk.LEFT, padx=4)
 
@@ -163,8 +180,33 @@ class TelopEditor(tk.Tk):
         self.ls_var = tk.IntVar(value=self.style.line_spacing)
         tk.Spinbox(arow, from_=0, to=200, width=5, textvariable=self.ls_var, command=self._refresh).pack(side=tk.LEFT, padx=4)
 
+        # 影/光彩
+        shrow = tk.Frame(right)
+        shrow.pack(fill=tk.X, pady=(4, 0))
+        self.shadow_var = tk.BooleanVar(value=self.style.shadow)
+        tk.Checkbutton(shrow, text="影", variable=self.shadow_var, command=self._refresh).pack(side=tk.LEFT)
+        tk.Button(shrow, text="影色", command=self._choose_shadow).pack(side=tk.LEFT, padx=4)
+        tk.Label(shrow, text="ぼかし").pack(side=tk.LEFT)
+        self.shadow_blur_var = tk.IntVar(value=self.style.shadow_blur)
+        tk.Spinbox(shrow, from_=0, to=64, width=4, textvariable=self.shadow_blur_var, command=self._refresh).pack(side=tk.LEFT, padx=4)
+        tk.Label(shrow, text="ずれ").pack(side=tk.LEFT)
+        self.shadow_dx_var = tk.IntVar(value=self.style.shadow_dx)
+        self.shadow_dy_var = tk.IntVar(value=self.style.shadow_dy)
+        tk.Spinbox(shrow, from_=-100, to=100, width=4, textvariable=self.shadow_dx_var, command=self._refresh).pack(side=tk.LEFT, padx=(4, 0))
+        tk.Spinbox(shrow, from_=-100, to=100, width=4, textvariable=self.shadow_dy_var, command=self._refresh).pack(side=tk.LEFT, padx=4)
+
+        grow = tk.Frame(right)
+        grow.pack(fill=tk.X, pady=(4, 0))
+        self.glow_var = tk.BooleanVar(value=self.style.glow)
+        tk.Checkbutton(grow, text="光彩", variable=self.glow_var, command=self._refresh).pack(side=tk.LEFT)
+        tk.Button(grow, text="光彩色", command=self._choose_glow).pack(side=tk.LEFT, padx=4)
+        tk.Label(grow, text="半径").pack(side=tk.LEFT)
+        self.glow_radius_var = tk.IntVar(value=self.style.glow_radius)
+        tk.Spinbox(grow, from_=1, to=64, width=4, textvariable=self.glow_radius_var, command=self._refresh).pack(side=tk.LEFT, padx=4)
+
         # 位置リセット/保存
         tk.Button(right, text="位置を初期化", command=self._reset_positions).pack(fill=tk.X, pady=(10, 4))
+        tk.Button(right, text="全体表示", command=self._reset_view).pack(fill=tk.X, pady=(0, 4))
         tk.Button(right, text="画像として保存…", command=self._export_image).pack(fill=tk.X)
         tk.Button(right, text="プリセット保存…", command=self._save_preset).pack(fill=tk.X, pady=(4,0))
 
@@ -172,6 +214,7 @@ class TelopEditor(tk.Tk):
         hint = (
             "◆ 操作\n"
             "・キャンバス上でクリックすると対象テロップが選択され、ドラッグで移動できます。\n"
+            "・ホイールでズーム、中/右ボタンのドラッグで表示位置を移動できます。\n"
             "・週次モードは起点日(週の月曜)から日付/曜日を自動付与し、一括テキスト(7行)で内容を差し込みます。\n"
             "・プレビューは実描画と同品質（縁取り/行間反映）。"
         )
@@ -195,9 +238,12 @@ class TelopEditor(tk.Tk):
             return
         self.base_image = img
         self.base_image_path = path
+        self._pyramid = {}
         self.image_info.config(text=f"{os.path.basename(path)}  {img.width}×{img.height}")
+        self.view_fitted = True
         self._fit_preview()
         self._init_items_if_needed()
+        self._auto_layout_week()
         self._refresh()
 
     def _export_image(self):
@@ -208,27 +254,7 @@ class TelopEditor(tk.Tk):
             messagebox.showwarning("フォント未選択", "フォントを選択してください。")
             return
 
-        out = self.base_image.copy()
-        draw = ImageDraw.Draw(out)
-        font = ImageFont.truetype(self.style.font_path, size=int(self.size_var.get()))
-        spacing = int(self.ls_var.get())
-        stroke_w = int(self.stroke_width_var.get())
-
-        items = self._get_items()
-        for it in items:
-            # プレビュー座標→実寸へ
-            ox, oy = self._preview_to_image_xy(it.pos)
-            draw.multiline_text(
-                (ox, oy),
-                it.text,
-                font=font,
-                fill=self.style.fill,
-                spacing=spacing,
-                align="left",
-                stroke_width=stroke_w,
-                stroke_fill=self.style.stroke_fill,
-                anchor="lt",
-            )
+        out = compose_items(self.base_image, self._get_items(), self._current_style())
 
         suggested = self._suggest_filename()
         save_path = filedialog.asksaveasfilename(
@@ -257,18 +283,10 @@ class TelopEditor(tk.Tk):
             messagebox.showwarning("フォント未選択", "フォントを選択してください。")
             return
 
-        positions = [self._preview_to_image_xy(it.pos) for it in self.week_items]
+        positions = [it.pos for it in self.week_items]
         preset = SchedulePreset(
             base_image=self.base_image_path or "",
-            style=TelopStyle(
-                family=self.style.family,
-                font_path=self.style.font_path,
-                font_size=int(self.size_var.get()),
-                fill=self.style.fill,
-                stroke_fill=self.style.stroke_fill,
-                stroke_width=int(self.stroke_width_var.get()),
-                line_spacing=int(self.ls_var.get()),
-            ),
+            style=self._current_style(),
             positions=positions,
         )
         save_path = filedialog.asksaveasfilename(
@@ -321,6 +339,14 @@ class TelopEditor(tk.Tk):
         self._ensure_font_path()
         self._refresh()
 
+    def _on_family_typed(self, evt=None):
+        if evt is not None and evt.keysym in ("Up", "Down", "Return", "Escape", "Tab"):
+            return
+        fams = self.fontdb.search(self.family_var.get())
+        self.family_box["values"] = fams or ["(該当なし)"]
+        if self.fontdb.get_path(self.family_var.get().strip()):
+            self._refresh()
+
     def _ensure_font_path(self) -> bool:
         fam = self.family_var.get().strip()
         if not fam or fam.startswith("("):
@@ -332,6 +358,28 @@ class TelopEditor(tk.Tk):
         self.style.font_path = path
         return True
 
+    def _current_style(self) -> TelopStyle:
+        """画面の設定値から描画用のスタイルを組み立てる"""
+        return TelopStyle(
+            family=self.style.family,
+            font_path=self.style.font_path,
+            font_size=int(self.size_var.get()),
+            fill=self.style.fill,
+            stroke_fill=self.style.stroke_fill,
+            stroke_width=int(self.stroke_width_var.get()),
+            line_spacing=int(self.ls_var.get()),
+            shadow=bool(self.shadow_var.get()),
+            shadow_color=self.style.shadow_color,
+            shadow_dx=int(self.shadow_dx_var.get()),
+            shadow_dy=int(self.shadow_dy_var.get()),
+            shadow_blur=int(self.shadow_blur_var.get()),
+            shadow_opacity=self.style.shadow_opacity,
+            glow=bool(self.glow_var.get()),
+            glow_color=self.style.glow_color,
+            glow_radius=int(self.glow_radius_var.get()),
+            glow_opacity=self.style.glow_opacity,
+        )
+
     def _choose_fill(self):
         c = colorchooser.askcolor(color=self.style.fill)[1]
         if c:
@@ -344,48 +392,157 @@ class TelopEditor(tk.Tk):
             self.style.stroke_fill = c
             self._refresh()
 
+    def _choose_shadow(self):
+        c = colorchooser.askcolor(color=self.style.shadow_color)[1]
+        if c:
+            self.style.shadow_color = c
+            self._refresh()
+
+    def _choose_glow(self):
+        c = colorchooser.askcolor(color=self.style.glow_color)[1]
+        if c:
+            self.style.glow_color = c
+            self._refresh()
+
     # ---------------- キャンバス関連 ----------------
+    ZOOM_STEP = 1.25
+    ZOOM_MAX = 8.0
+
     def _on_canvas_resize(self, _evt=None):
-        self._fit_preview()
-        self._auto_layout_week()  # サイズ変化時に再配置（週次）
+        if self.view_fitted:
+            self._fit_preview()
+        else:
+            self._render_view()
         self._refresh()
 
     def _fit_preview(self):
-        self.canvas.delete("all")
         if self.base_image is None:
+            self.canvas.delete("img")
             return
         cw = max(100, self.canvas.winfo_width())
         ch = max(100, self.canvas.winfo_height())
         iw, ih = self.base_image.size
         scale = min(cw / iw, ch / ih)
         scale = max(0.01, min(1.0, scale))
+        self.fit_scale = scale
         self.preview_scale = scale
         pw, ph = int(iw * scale), int(ih * scale)
-        preview = self.base_image.resize((pw, ph), Image.LANCZOS)
-        self._bgphoto = ImageTk.PhotoImage(preview)
-        ox = (cw - pw) // 2
-        oy = (ch - ph) // 2
-        self.canvas.create_image(ox, oy, image=self._bgphoto, anchor="nw", tags=("img",))
+        self.view_offset = ((cw - pw) // 2, (ch - ph) // 2)
+        self._render_view()
+
+    def _render_view(self):
+        """キャンバスに見えている範囲だけをベース画像から切り出して表示する"""
+        self.canvas.delete("img")
+        if self.base_image is None:
+            return
+        cw = max(100, self.canvas.winfo_width())
+        ch = max(100, self.canvas.winfo_height())
+        iw, ih = self.base_image.size
+        s = self.preview_scale
+        ox, oy = self.view_offset
+        # 表示領域(キャンバス座標)と画像矩形の交差
+        cx0, cy0 = max(0, ox), max(0, oy)
+        cx1 = min(cw, ox + int(round(iw * s)))
+        cy1 = min(ch, oy + int(round(ih * s)))
+        if cx1 <= cx0 or cy1 <= cy0:
+            return
+        src, factor = self._base_level(s)
+        view = self._resample_visible(src, (ox, oy), s / factor, (cx0, cy0, cx1, cy1))
+        self._bgphoto = ImageTk.PhotoImage(view)
+        self.canvas.create_image(cx0, cy0, image=self._bgphoto, anchor="nw", tags=("img",))
+        self.canvas.tag_lower("img")
+
+    @staticmethod
+    def _resample_visible(src: Image.Image, origin: Tuple[int, int], k: float,
+                          visible: Tuple[int, int, int, int]) -> Image.Image:
+        """src を k 倍して origin(キャンバス座標)に置いたときの visible 部分だけを作る"""
+        ox, oy = origin
+        cx0, cy0, cx1, cy1 = visible
+        # 同じ範囲を src の座標(小数)で求め、周辺だけ切り出してから再サンプリング
+        x0, y0 = (cx0 - ox) / k, (cy0 - oy) / k
+        x1 = min(src.width, (cx1 - ox) / k)
+        y1 = min(src.height, (cy1 - oy) / k)
+        pad = 3  # LANCZOSの参照範囲
+        sx0, sy0 = max(0, int(x0) - pad), max(0, int(y0) - pad)
+        sx1, sy1 = min(src.width, int(x1) + pad + 1), min(src.height, int(y1) + pad + 1)
+        crop = src.crop((sx0, sy0, sx1, sy1))
+        return crop.resize((cx1 - cx0, cy1 - cy0), Image.LANCZOS,
+                           box=(x0 - sx0, y0 - sy0, x1 - sx0, y1 - sy0))
+
+    def _telop_layer(self, text: str, style: TelopStyle, raster: float, font) -> Tuple[Image.Image, Tuple[int, int]]:
+        """倍率 raster で描いたテロップのレイヤー。文字/スタイル/倍率が同じ間は使い回す"""
+        key = (text, raster, astuple(style))
+        hit = self._telop_layers.get(key)
+        if hit is None:
+            hit = render_layer(text, style, raster, font=font)
+            self._telop_layers.put(key, hit)
+        return hit
+
+    def _base_level(self, scale: float) -> Tuple[Image.Image, int]:
+        """表示倍率に足る解像度の縮小版(1/2^k)を返す。作成済みの段は使い回す"""
+        factor = 1
+        while factor < 64 and factor * 2 * scale <= 1.0:
+            factor *= 2
+        img = self._pyramid.get(factor)
+        if img is None:
+            img = self.base_image.reduce(factor) if factor > 1 else self.base_image
+            self._pyramid[factor] = img
+        return img, factor
+
+    def _zoom_at(self, x: int, y: int, factor: float):
+        if self.base_image is None:
+            return
+        old = self.preview_scale
+        new = max(self.fit_scale, min(self.ZOOM_MAX, old * factor))
+        if new == old:
+            return
+        # カーソル下の画像座標が動かないようにオフセットを調整
+        ox, oy = self.view_offset
+        self.view_offset = (
+            int(round(x - (x - ox) * new / old)),
+            int(round(y - (y - oy) * new / old)),
+        )
+        self.preview_scale = new
+        self.view_fitted = False
+        self._render_view()
+        self._refresh()
+
+    def _reset_view(self):
+        self.view_fitted = True
+        self._fit_preview()
+        self._refresh()
+
+    def _on_mouse_wheel(self, evt):
+        if evt.num == 4 or getattr(evt, "delta", 0) > 0:
+            self._zoom_at(evt.x, evt.y, self.ZOOM_STEP)
+        elif evt.num == 5 or getattr(evt, "delta", 0) < 0:
+            self._zoom_at(evt.x, evt.y, 1 / self.ZOOM_STEP)
+
+    def _on_pan_start(self, evt):
+        self._pan_anchor = (evt.x, evt.y)
+
+    def _on_pan_drag(self, evt):
+        if self.base_image is None or getattr(self, "_pan_anchor", None) is None:
+            return
+        ax, ay = self._pan_anchor
+        ox, oy = self.view_offset
+        self.view_offset = (ox + evt.x - ax, oy + evt.y - ay)
+        self._pan_anchor = (evt.x, evt.y)
+        self.view_fitted = False
+        self._render_view()
+        self._refresh()
 
     def _preview_to_image_xy(self, pos: Tuple[int, int]) -> Tuple[int, int]:
         # 背景画像の左上オフセットを考慮し、プレビュー→実寸へ
-        cw, ch = self.canvas.winfo_width(), self.canvas.winfo_height()
-        iw, ih = self.base_image.size
-        pw, ph = int(iw * self.preview_scale), int(ih * self.preview_scale)
-        ox = (cw - pw) // 2
-        oy = (ch - ph) // 2
-        x = int((pos[0] - ox) / self.preview_scale)
-        y = int((pos[1] - oy) / self.preview_scale)
+        ox, oy = self.view_offset
+        x = int(round((pos[0] - ox) / self.preview_scale))
+        y = int(round((pos[1] - oy) / self.preview_scale))
         return x, y
 
     def _image_to_preview_xy(self, pos: Tuple[int, int]) -> Tuple[int, int]:
-        cw, ch = self.canvas.winfo_width(), self.canvas.winfo_height()
-        iw, ih = self.base_image.size
-        pw, ph = int(iw * self.preview_scale), int(ih * self.preview_scale)
-        ox = (cw - pw) // 2
-        oy = (ch - ph) // 2
-        x = int(pos[0] * self.preview_scale + ox)
-        y = int(pos[1] * self.preview_scale + oy)
+        ox, oy = self.view_offset
+        x = int(round(pos[0] * self.preview_scale)) + ox
+        y = int(round(pos[1] * self.preview_scale)) + oy
         return x, y
 
     def _refresh(self):
@@ -402,44 +559,56 @@ class TelopEditor(tk.Tk):
         if not self._ensure_font_path():
             # フォント未選択時はTk描画の簡易フォールバック
             for it in items:
-                x, y = it.pos
+                x, y = self._image_to_preview_xy(it.pos)
                 self.canvas.create_text(x, y, text=it.text or " ", fill=self.style.fill,
                                         font=("", max(8, int(self.size_var.get()*self.preview_scale))),
                                         anchor="nw", tags=("telop",))
             return
 
+        style = self._current_style()
+        scale = self.preview_scale
+        # テロップは min(倍率, 1) で一度だけ描いてキャッシュし、拡大表示では
+        # 背景と同じく見えている部分だけを切り出して k 倍に再サンプリングする
+        raster = min(scale, 1.0)
+        k = scale / raster
+        psize, spacing, stroke_w = scaled_metrics(style, raster)
         try:
-            psize = max(8, int(self.size_var.get() * self.preview_scale))
-            font = ImageFont.truetype(self.style.font_path, size=psize)
+            font = load_font(self.style.font_path, psize)
         except Exception:
             # 失敗時は簡易フォールバック
             for it in items:
-                x, y = it.pos
+                x, y = self._image_to_preview_xy(it.pos)
                 self.canvas.create_text(x, y, text=it.text or " ", fill=self.style.fill,
                                         font=("", max(8, int(self.size_var.get()*self.preview_scale))),
                                         anchor="nw", tags=("telop",))
             return
 
-        spacing = max(0, int(self.ls_var.get() * self.preview_scale))
-        stroke_w = max(0, int(self.stroke_width_var.get() * self.preview_scale))
+        cw, ch = self.canvas.winfo_width(), self.canvas.winfo_height()
 
         for idx, it in enumerate(items):
             # テキストのサイズを取得
             text = it.text if it.text else " "
-            bbox = ImageDraw.Draw(Image.new("RGBA", (1, 1))).multiline_textbbox(
-                (0, 0), text, font=font, spacing=spacing, align="left", stroke_width=stroke_w, anchor="lt")
-            w = max(1, bbox[2] - bbox[0])
-            h = max(1, bbox[3] - bbox[1])
-            img = Image.new("RGBA", (w, h), (0, 0, 0, 0))
-            d = ImageDraw.Draw(img)
-            d.multiline_text((0, 0), text, font=font, fill=self.style.fill, spacing=spacing,
-                             align="left", stroke_width=stroke_w, stroke_fill=self.style.stroke_fill, anchor="lt")
+            bbox = text_bbox(text, font, spacing, stroke_w)
+            w = max(1, int(round((bbox[2] - bbox[0]) * k)))
+            h = max(1, int(round((bbox[3] - bbox[1]) * k)))
+            x, y = self._image_to_preview_xy(it.pos)
+            it.bbox = (x, y, x + w, y + h)
+            # 表示範囲と重なる部分だけを描画（ズーム時に画面外を描かない）
+            layer, (lx, ly) = self._telop_layer(text, style, raster, font)
+            lx0, ly0 = x + int(round(lx * k)), y + int(round(ly * k))
+            vx0, vy0 = max(lx0, 0), max(ly0, 0)
+            vx1 = min(lx0 + int(round(layer.width * k)), cw)
+            vy1 = min(ly0 + int(round(layer.height * k)), ch)
+            if vx1 <= vx0 or vy1 <= vy0:
+                continue
+            if k == 1.0:
+                img = layer.crop((vx0 - lx0, vy0 - ly0, vx1 - lx0, vy1 - ly0))
+            else:
+                img = self._resample_visible(layer, (lx0, ly0), k, (vx0, vy0, vx1, vy1))
             ph = ImageTk.PhotoImage(img)
-            x, y = it.pos
-            self.canvas.create_image(x, y, image=ph, anchor="nw", tags=("telop", f"telop_{idx}"))
-            # 参照保持＆矩形更新
+            self.canvas.create_image(vx0, vy0, image=ph, anchor="nw", tags=("telop", f"telop_{idx}"))
+            # 参照保持
             setattr(self, f"_telop_photo_{idx}", ph)
-            it.bbox = (x, y, x + w, y + h)
 
     # ------------- ドラッグ/選択 -------------
     def _hit_test(self, x: int, y: int) -> Optional[int]:
@@ -465,7 +634,9 @@ class TelopEditor(tk.Tk):
         self._drag_offset = None
         if self.active_index is not None:
             it = self._get_items()[self.active_index]
-            self._drag_offset = (evt.x - it.pos[0], evt.y - it.pos[1])
+            # ドラッグ量は画像座標で保持（ズーム/パンの影響を受けない）
+            ix, iy = self._preview_to_image_xy((evt.x, evt.y))
+            self._drag_offset = (ix - it.pos[0], iy - it.pos[1])
 
     def _on_mouse_drag(self, evt):
         if self.active_index is None or self._drag_offset is None:
@@ -473,7 +644,8 @@ class TelopEditor(tk.Tk):
         dx, dy = self._drag_offset
         items = self._get_items()
         it = items[self.active_index]
-        it.pos = (evt.x - dx, evt.y - dy)
+        ix, iy = self._preview_to_image_xy((evt.x, evt.y))
+        it.pos = (ix - dx, iy - dy)
         self._refresh()
 
     def _on_mouse_up(self, _evt):
@@ -518,27 +690,23 @@ class TelopEditor(tk.Tk):
     def _auto_layout_week(self):
         if self.mode_var.get() != "weekly" or self.base_image is None:
             return
-        # プレビュー上の画像矩形
-        cw, ch = self.canvas.winfo_width(), self.canvas.winfo_height()
+        # 画像座標で配置（余白は全体表示時の見た目のpx数）
         iw, ih = self.base_image.size
-        pw, ph = int(iw * self.preview_scale), int(ih * self.preview_scale)
-        ox = (cw - pw) // 2
-        oy = (ch - ph) // 2
-        margin = int(self.margin_var.get())
+        margin = int(self.margin_var.get() / self.fit_scale)
 
         horiz = (self.orientation_var.get() == "horizontal")
         if horiz:
-            cell_w = pw / 7
-            y = oy + margin
+            cell_w = iw / 7
+            y = margin
             for i, it in enumerate(self.week_items):
-                x = ox + int(i * cell_w) + margin
+                x = int(i * cell_w) + margin
                 it.pos = (x, y)
                 it.auto_pos = it.pos
         else:
-            cell_h = ph / 7
-            x = ox + margin
+            cell_h = ih / 7
+            x = margin
             for i, it in enumerate(self.week_items):
-                y = oy + int(i * cell_h) + margin
+                y = int(i * cell_h) + margin
                 it.pos = (x, y)
                 it.auto_pos = it.pos
 
@@ -555,14 +723,10 @@ class TelopEditor(tk.Tk):
     def _init_items_if_needed(self):
         if self.base_image is None:
             return
-        cw, ch = self.canvas.winfo_width(), self.canvas.winfo_height()
-        iw, ih = self.base_image.size
-        pw, ph = int(iw * self.preview_scale), int(ih * self.preview_scale)
-        ox = (cw - pw) // 2
-        oy = (ch - ph) // 2
+        step = 1 / self.fit_scale
         if self.mode_var.get() == "single":
             if not self.single_item:
-                p = (ox + 24, oy + 24)
+                p = (int(24 * step), int(24 * step))
                 self.single_item = TelopItem(text=self.single_text.get(), pos=p, auto_pos=p)
         else:
             if not self.week_items:
@@ -571,7 +735,7 @@ class TelopEditor(tk.Tk):
                 for i in range(7):
                     d = today + dt.timedelta(days=i)
                     txt = f"{d.month}/{d.day}（{ja[i]}）"
-                    p = (ox + 24, oy + 24 + i * 40)
+                    p = (int(24 * step), int((24 + i * 40) * step))
                     self.week_items.append(TelopItem(text=txt, pos=p, auto_pos=p))
                 self._auto_layout_week()
 
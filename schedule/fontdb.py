@@ -1,6 +1,42 @@
-from typing import Optional, List, Dict
+from typing import Optional, List, Dict, Tuple
+from bisect import bisect_left
 import os
 import platform
+import unicodedata
+
+
+# ファイル名からスタイルを推定する際の優先タグ（Regular/Book/Medium 優先）
+_PREF_TAGS = ["Regular", "Book", "Medium", "Normal", "400", "Demilight", "Roman"]
+_NAMED_WEIGHTS = {
+    "ultralight": 100, "thin": 100, "extralight": 200, "light": 300,
+    "normal": 400, "regular": 400, "book": 400, "medium": 500, "roman": 400,
+    "semibold": 600, "demibold": 600, "demi": 600, "bold": 700,
+    "extrabold": 800, "heavy": 800, "black": 900,
+}
+
+
+def _weight_value(weight) -> int:
+    """matplotlib の weight(数値 or 名前)を 100〜900 の数値へ"""
+    try:
+        return int(weight)
+    except (TypeError, ValueError):
+        return _NAMED_WEIGHTS.get(str(weight).replace(" ", "").lower(), 400)
+
+
+def _face_rank(path: str, style: Optional[str], weight: Optional[int]) -> Tuple[int, int, int]:
+    """値が小さいほど「標準の字形」らしい"""
+    italic = 1 if style and style.lower() in ("italic", "oblique") else 0
+    w = 400 if weight is None else weight
+    base = os.path.basename(path).lower()
+    tagged = 0 if any(tag.lower() in base for tag in _PREF_TAGS) else 1
+    return italic, abs(w - 400), tagged
+
+
+def fold_key(text: str) -> str:
+    """検索用の正規化（全角/半角・大文字小文字・ひらがな/カタカナを同一視）"""
+    s = unicodedata.normalize("NFKC", text).casefold()
+    # ひらがな(ぁ〜ゖ)をカタカナへ寄せる
+    return "".join(chr(ord(c) + 0x60) if "\u3041" <= c <= "\u3096" else c for c in s)
 
 
 class FontDB:
@@ -8,7 +44,17 @@ class FontDB:
 
     def __init__(self) -> None:
         self.family_to_paths: Dict[str, List[str]] = {}
+        self.family_to_regular: Dict[str, str] = {}  # ファミリ -> 優先する標準フェイス
+        self._ranks: Dict[str, Tuple[int, int, int]] = {}
         self._build()
+        self._build_index()
+
+    def _add(self, family: str, path: str, style: Optional[str] = None, weight: Optional[int] = None) -> None:
+        self.family_to_paths.setdefault(family, []).append(path)
+        rank = _face_rank(path, style, weight)
+        if family not in self._ranks or rank < self._ranks[family]:
+            self._ranks[family] = rank
+            self.family_to_regular[family] = path
 
     def _build(self) -> None:
         # 1) matplotlib の FontManager があれば使う（推奨）
@@ -20,7 +66,9 @@ class FontDB:
                 path = getattr(fe, "fname", None)
                 if not name or not path:
                     continue
-                self.family_to_paths.setdefault(name, []).append(path)
+                weight = getattr(fe, "weight", None)
+                self._add(name, path, getattr(fe, "style", None),
+                          None if weight is None else _weight_value(weight))
             if self.family_to_paths:
                 return
         except Exception:
@@ -55,19 +103,47 @@ class FontDB:
                         path = os.path.join(root, f)
                         # 簡易的にファイル名から推定
                         family = os.path.splitext(f)[0]
-                        self.family_to_paths.setdefault(family, []).append(path)
+                        self._add(family, path)
+
+    def _build_index(self) -> None:
+        # 前方一致は二分探索、部分一致は前回結果の絞り込みで応答する
+        self._sorted_families = sorted(self.family_to_paths.keys(), key=str.casefold)
+        self._order = {fam: i for i, fam in enumerate(self._sorted_families)}
+        self._keys = {fam: fold_key(fam) for fam in self._sorted_families}
+        self._prefix_index = sorted((k, fam) for fam, k in self._keys.items())
+        self._folded_to_family = {fam.casefold(): fam for fam in self._sorted_families}
+        self._last_query = ""
+        self._last_hits = self._sorted_families
 
     def families(self) -> List[str]:
-        return sorted(self.family_to_paths.keys(), key=str.casefold)
+        return list(self._sorted_families)
 
     def get_path(self, family: str) -> Optional[str]:
-        # Regular/Book/Medium 優先
-        prefs = ["Regular", "Book", "Medium", "Normal", "400", "Demilight", "Roman"]
-        paths = self.family_to_paths.get(family, [])
-        if not paths:
-            return None
-        for p in paths:
-            base = os.path.basename(p)
-            if any(tag.lower() in base.lower() for tag in prefs):
-                return p
-        return paths[0]
+        path = self.family_to_regular.get(family)
+        if path is None:
+            fam = self._folded_to_family.get(family.casefold())
+            path = self.family_to_regular.get(fam) if fam else None
+        return path
+
+    def search(self, query: str) -> List[str]:
+        """前方一致→部分一致の順でファミリ名を返す（入力中の逐次絞り込み用）"""
+        q = fold_key(query.strip())
+        if not q:
+            self._last_query, self._last_hits = "", self._sorted_families
+            return self.families()
+        # 前回の語を延長した入力なら前回のヒットだけを調べ直せばよい
+        if self._last_query and q.startswith(self._last_query):
+            pool = self._last_hits
+        else:
+            pool = self._sorted_families
+        hits = [fam for fam in pool if q in self._keys[fam]]
+        self._last_query, self._last_hits = q, hits
+
+        i = bisect_left(self._prefix_index, (q,))
+        prefix = []
+        while i < len(self._prefix_index) and self._prefix_index[i][0].startswith(q):
+            prefix.append(self._prefix_index[i][1])
+            i += 1
+        prefix.sort(key=self._order.__getitem__)
+        seen = set(prefix)
+        return prefix + [fam for fam in hits if fam not in seen]
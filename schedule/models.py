@@ -11,16 +11,38 @@ class TelopStyle:
     stroke_fill: str = "#000000"
     stroke_width: int = 2
     line_spacing: int = 8
+    # ドロップシャドウ
+    shadow: bool = False
+    shadow_color: str = "#000000"
+    shadow_dx: int = 4
+    shadow_dy: int = 4
+    shadow_blur: int = 6  # ぼかし半径(px)
+    shadow_opacity: float = 0.6
+    # 外側の光彩
+    glow: bool = False
+    glow_color: str = "#ffffff"
+    glow_radius: int = 10
+    glow_opacity: float = 0.8
 
 
 @dataclass
 class TelopItem:
     text: str
-    pos: Tuple[int, int]  # プレビュー座標
-    auto_pos: Tuple[int, int]  # 自動配置の基準（リセット用）
+    pos: Tuple[int, int]  # 画像座標(描画開始位置)
+    auto_pos: Tuple[int, int]  # 自動配置の基準（リセット用、画像座標）
     bbox: Tuple[int, int, int, int] = (0, 0, 0, 0)  # プレビュー上の描画矩形(x0,y0,x1,y1)
 
 
+@dataclass
+class Keyframe:
+    """アニメーション書き出し用のキーフレーム（間は線形補間）"""
+
+    t: float  # 秒
+    dx: int = 0  # 配置位置からのずれ(画像座標)
+    dy: int = 0
+    alpha: float = 1.0  # 0.0〜1.0
+
+
 @dataclass
 class SchedulePreset:
     """週次予定表作成用のプリセット情報"""
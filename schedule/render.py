@@ -0,0 +1,237 @@
+"""テロップ描画の共通処理（エディタのプレビュー/書き出しと generate_schedule で共用）"""
+from collections import OrderedDict
+from functools import lru_cache
+from typing import Optional, Tuple, List, Hashable, Sequence
+
+from PIL import Image, ImageDraw, ImageFont, ImageFilter, ImageColor
+
+from .models import TelopItem, TelopStyle
+
+Box = Tuple[int, int, int, int]
+
+_measure = ImageDraw.Draw(Image.new("L", (1, 1)))
+
+
+@lru_cache(maxsize=32)
+def load_font(path: str, size: int) -> ImageFont.FreeTypeFont:
+    return ImageFont.truetype(path, size=size)
+
+
+def scaled_metrics(style: TelopStyle, scale: float = 1.0) -> Tuple[int, int, int]:
+    """(フォントサイズ, 行間, 縁幅) を表示倍率に合わせて返す"""
+    if scale == 1.0:
+        return style.font_size, style.line_spacing, style.stroke_width
+    return (
+        max(8, int(style.font_size * scale)),
+        max(0, int(style.line_spacing * scale)),
+        max(0, int(style.stroke_width * scale)),
+    )
+
+
+def _nbytes(value: Tuple[Image.Image, Tuple[int, int]]) -> int:
+    img = value[0]
+    return img.width * img.height * len(img.getbands())
+
+
+class LayerCache:
+    """(画像, オフセット) のLRUキャッシュ。件数ではなく画素バイト数(w·h·バンド数)の合計で上限を設ける"""
+
+    def __init__(self, max_bytes: int = 256 << 20) -> None:
+        self.max_bytes = max_bytes
+        self.nbytes = 0
+        self._items: "OrderedDict[Hashable, Tuple[Image.Image, Tuple[int, int]]]" = OrderedDict()
+
+    def get(self, key: Hashable):
+        value = self._items.get(key)
+        if value is not None:
+            self._items.move_to_end(key)
+        return value
+
+    def put(self, key: Hashable, value: Tuple[Image.Image, Tuple[int, int]]) -> None:
+        size = _nbytes(value)
+        old = self._items.pop(key, None)
+        if old is not None:
+            self.nbytes -= _nbytes(old)
+        if size > self.max_bytes:
+            return  # 上限を超える1枚は持たない
+        self._items[key] = value
+        self.nbytes += size
+        while self.nbytes > self.max_bytes:
+            _key, dropped = self._items.popitem(last=False)
+            self.nbytes -= _nbytes(dropped)
+
+    def clear(self) -> None:
+        self._items.clear()
+        self.nbytes = 0
+
+
+layer_cache = LayerCache()
+
+
+def _blur_factor(radius: float) -> int:
+    # 縮小後もぼかし半径が2px以上残る範囲で 1/2, 1/4, 1/8 に落としてからぼかす
+    factor = 1
+    while factor < 8 and radius / (factor * 2) >= 2:
+        factor *= 2
+    return factor
+
+
+def _anchored(xy: Tuple[int, int], text: str, font: ImageFont.FreeTypeFont) -> Tuple[Tuple[int, int], str]:
+    """左上("lt")基準の座標を、複数行でも描ける (座標, anchor) に変換する"""
+    if "\n" not in text:
+        return xy, "lt"
+    # Pillow は複数行の "lt" を受け付けないため、1行目の上端ぶんずらして "la" で描く
+    top = font.getbbox(text.split("\n", 1)[0], anchor="la")[1]
+    return (xy[0], xy[1] - top), "la"
+
+
+def text_bbox(text: str, font: ImageFont.FreeTypeFont, spacing: int, stroke_width: int) -> Box:
+    """(0, 0) を左上として描いたときの文字(縁込み)の矩形"""
+    xy, anchor = _anchored((0, 0), text, font)
+    return _measure.multiline_textbbox(xy, text, font=font, spacing=spacing, align="left",
+                                       stroke_width=stroke_width, anchor=anchor)
+
+
+def _blurred_mask(text: str, font: ImageFont.FreeTypeFont, spacing: int, stroke_width: int,
+                  radius: float, cache: bool = True) -> Tuple[Image.Image, Tuple[int, int]]:
+    """文字(縁込み)の形をぼかしたアルファと、描画位置からのオフセット"""
+    key = ("mask", text, font.path, font.size, spacing, stroke_width, radius)
+    hit = layer_cache.get(key) if cache else None
+    if hit is not None:
+        return hit
+    factor = _blur_factor(radius)
+    pad = int(radius * 3) + 1
+    bx0, by0, bx1, by1 = text_bbox(text, font, spacing, stroke_width)
+    # 縮小率で割り切れる大きさにして、拡大し戻したときに位置がずれないようにする
+    w = -(-(bx1 - bx0 + 2 * pad) // factor) * factor
+    h = -(-(by1 - by0 + 2 * pad) // factor) * factor
+    mask = Image.new("L", (w, h), 0)
+    xy, anchor = _anchored((pad - bx0, pad - by0), text, font)
+    ImageDraw.Draw(mask).multiline_text(xy, text, font=font, fill=255, spacing=spacing,
+                                        align="left", stroke_width=stroke_width, stroke_fill=255, anchor=anchor)
+    if factor > 1:
+        small = mask.reduce(factor).filter(ImageFilter.GaussianBlur(radius / factor))
+        mask = small.resize((w, h), Image.BILINEAR)
+    else:
+        mask = mask.filter(ImageFilter.GaussianBlur(radius))
+    hit = (mask, (bx0 - pad, by0 - pad))
+    if cache:
+        layer_cache.put(key, hit)
+    return hit
+
+
+def _effect_layer(text: str, font: ImageFont.FreeTypeFont, spacing: int, stroke_width: int, color: str,
+                  opacity: float, radius: float, gain: float,
+                  cache: bool = True) -> Tuple[Image.Image, Tuple[int, int]]:
+    key = ("layer", text, font.path, font.size, spacing, stroke_width, radius, color, opacity, gain)
+    hit = layer_cache.get(key) if cache else None
+    if hit is not None:
+        return hit
+    mask, offset = _blurred_mask(text, font, spacing, stroke_width, radius, cache)
+    k = max(0.0, opacity) * gain
+    alpha = mask.point([min(255, int(v * k)) for v in range(256)])
+    layer = Image.new("RGBA", mask.size, ImageColor.getrgb(color)[:3] + (0,))
+    layer.putalpha(alpha)
+    hit = (layer, offset)
+    if cache:
+        layer_cache.put(key, hit)
+    return hit
+
+
+def _effects(style: TelopStyle, scale: float) -> List[Tuple[str, float, float, float, int, int]]:
+    """(色, 不透明度, ぼかし半径, 強調率, dx, dy) を背面から順に"""
+    out = []
+    if style.glow and style.glow_radius > 0:
+        out.append((style.glow_color, style.glow_opacity, round(style.glow_radius * scale, 1), 2.0, 0, 0))
+    if style.shadow:
+        out.append((style.shadow_color, style.shadow_opacity, round(max(0.0, style.shadow_blur * scale), 1), 1.0,
+                    int(round(style.shadow_dx * scale)), int(round(style.shadow_dy * scale))))
+    return out
+
+
+def composite_at(dst: Image.Image, layer: Image.Image, x: int, y: int) -> None:
+    """dst からはみ出す部分を切り落として alpha_composite する"""
+    sx0, sy0 = max(0, -x), max(0, -y)
+    sx1 = min(layer.width, dst.width - x)
+    sy1 = min(layer.height, dst.height - y)
+    if sx1 <= sx0 or sy1 <= sy0:
+        return
+    dst.alpha_composite(layer, dest=(x + sx0, y + sy0), source=(sx0, sy0, sx1, sy1))
+
+
+def _text_layer(text: str, font: ImageFont.FreeTypeFont, spacing: int, stroke_width: int,
+                style: TelopStyle) -> Tuple[Image.Image, Tuple[int, int]]:
+    """文字(縁込み)だけを透明レイヤーに描き、描画位置からのオフセットと返す"""
+    bx0, by0, bx1, by1 = text_bbox(text, font, spacing, stroke_width)
+    # 透明部分の色を外周の色(縁 or 文字色)にしておき、輪郭のアンチエイリアスが黒ずまないようにする
+    edge = style.stroke_fill if stroke_width > 0 else style.fill
+    layer = Image.new("RGBA", (max(1, bx1 - bx0), max(1, by1 - by0)), ImageColor.getrgb(edge)[:3] + (0,))
+    xy, anchor = _anchored((-bx0, -by0), text, font)
+    ImageDraw.Draw(layer).multiline_text(
+        xy,
+        text,
+        font=font,
+        fill=style.fill,
+        spacing=spacing,
+        align="left",
+        stroke_width=stroke_width,
+        stroke_fill=style.stroke_fill,
+        anchor=anchor,
+    )
+    return layer, (bx0, by0)
+
+
+def telop_parts(text: str, style: TelopStyle, scale: float = 1.0,
+                font: Optional[ImageFont.FreeTypeFont] = None) -> List[Tuple[Image.Image, Tuple[int, int]]]:
+    """(レイヤー, 描画位置からのオフセット) を背面から順に返す（光彩, 影, 文字）
+
+    キャッシュするのは実寸(scale=1.0)の効果レイヤーだけ。表示倍率ごとのレイヤーは
+    倍率を変えるたびに別物になるので、呼び出し側で必要なら持つ。
+    """
+    size, spacing, stroke_w = scaled_metrics(style, scale)
+    font = font or load_font(style.font_path, size)
+    cache = scale == 1.0
+    parts = []
+    for color, opacity, radius, gain, dx, dy in _effects(style, scale):
+        layer, (lx, ly) = _effect_layer(text, font, spacing, stroke_w, color, opacity, radius, gain, cache)
+        parts.append((layer, (lx + dx, ly + dy)))
+    parts.append(_text_layer(text, font, spacing, stroke_w, style))
+    return parts
+
+
+def flatten_parts(parts: List[Tuple[Image.Image, Tuple[int, int]]]) -> Tuple[Image.Image, Tuple[int, int]]:
+    """telop_parts を1枚のレイヤーへ重ねる（外接矩形は各レイヤーの和）"""
+    x0 = min(ox for _layer, (ox, _oy) in parts)
+    y0 = min(oy for _layer, (_ox, oy) in parts)
+    x1 = max(ox + layer.width for layer, (ox, _oy) in parts)
+    y1 = max(oy + layer.height for layer, (_ox, oy) in parts)
+    out = Image.new("RGBA", (x1 - x0, y1 - y0), (0, 0, 0, 0))
+    for layer, (ox, oy) in parts:
+        out.alpha_composite(layer, dest=(ox - x0, oy - y0))
+    return out, (x0, y0)
+
+
+def draw_telop(img: Image.Image, xy: Tuple[int, int], text: str, style: TelopStyle, scale: float = 1.0,
+               font: Optional[ImageFont.FreeTypeFont] = None) -> None:
+    """img(RGBA) の xy を左上としてテロップを描く
+
+    光彩/影/文字を別々の透明レイヤーにして背面から alpha_composite するので、
+    アニメーションの合成(同じレイヤーを同じ順に重ねる)と結果が一致する。
+    """
+    x, y = xy
+    for layer, (lx, ly) in telop_parts(text, style, scale, font=font):
+        composite_at(img, layer, x + lx, y + ly)
+
+
+def compose_items(base: Image.Image, items: Sequence[TelopItem], style: TelopStyle) -> Image.Image:
+    """base の複製に各テロップを画像座標どおりに描く（エディタの書き出しと検証ツールで共用）"""
+    out = base.copy()
+    for it in items:
+        draw_telop(out, it.pos, it.text, style)
+    return out
+
+
+def render_layer(text: str, style: TelopStyle, scale: float = 1.0,
+                 font: Optional[ImageFont.FreeTypeFont] = None) -> Tuple[Image.Image, Tuple[int, int]]:
+    """テロップを1枚の透明レイヤーに重ねて、(レイヤー, 描画位置からのオフセット) を返す"""
+    return flatten_parts(telop_parts(text, style, scale, font=font))
@@ -0,0 +1,117 @@
+"""複数プロセスでベース画像を共有するためのアセットストア
+
+コーディネータ(親プロセス)がベース画像を一度だけデコードし、生の RGBA を
+メモリマップ用のファイル(Linux では /dev/shm)に書き出す。ワーカーはそれを
+読み取り専用で mmap し、Image.frombuffer でコピーせずに包む。描画用には
+コピーオンライトで写像するので、テロップを描いたページだけがそのプロセスに複製される。
+"""
+import mmap
+import os
+import tempfile
+from dataclasses import dataclass
+from multiprocessing import Pool
+from typing import Optional, Tuple, List, Dict, Sequence
+
+from PIL import Image
+
+from .models import SchedulePreset
+from .render import draw_telop
+
+
+@dataclass(frozen=True)
+class SharedImageHandle:
+    """ワーカーへ渡す共有画像の情報（pickle 可能）"""
+
+    path: str  # 生の RGBA を並べたファイル
+    size: Tuple[int, int]
+    mode: str = "RGBA"
+
+    def _map(self, access: int) -> Image.Image:
+        with open(self.path, "rb") as f:
+            mm = mmap.mmap(f.fileno(), 0, access=access)
+        # 画像が mmap を参照し続けるので、ファイルを閉じても写像は有効
+        return Image.frombuffer(self.mode, self.size, mm, "raw", self.mode, 0, 1)
+
+    def open_view(self) -> Image.Image:
+        """読み取り専用のビュー（コピーなし）"""
+        return self._map(mmap.ACCESS_READ)
+
+    def open_canvas(self) -> Image.Image:
+        """描画可能な画像。書き換えたページだけがこのプロセスに複製され、共有元は変わらない"""
+        img = self._map(mmap.ACCESS_COPY)
+        img.readonly = 0  # 私有写像なので直接書き込んでよい
+        return img
+
+
+class SharedAssetStore:
+    """ベース画像を一度だけデコードして公開する（コーディネータ側）"""
+
+    def __init__(self, directory: Optional[str] = None) -> None:
+        if directory is None:
+            directory = "/dev/shm" if os.path.isdir("/dev/shm") else tempfile.gettempdir()
+        self.directory = directory
+        self._handles: Dict[str, SharedImageHandle] = {}
+
+    def publish(self, image_path: str) -> SharedImageHandle:
+        key = os.path.abspath(image_path)
+        handle = self._handles.get(key)
+        if handle is not None:
+            return handle
+        img = Image.open(image_path).convert("RGBA")
+        fd, path = tempfile.mkstemp(prefix="schedule-", suffix=".rgba", dir=self.directory)
+        with os.fdopen(fd, "wb") as f:
+            # 帯ごとに書き出して一時的な複製を小さく抑える
+            step = max(1, (16 << 20) // (img.width * 4))
+            for y in range(0, img.height, step):
+                f.write(img.crop((0, y, img.width, min(img.height, y + step))).tobytes())
+        handle = SharedImageHandle(path=path, size=img.size)
+        self._handles[key] = handle
+        return handle
+
+    def publish_preset(self, preset: SchedulePreset) -> SharedImageHandle:
+        return self.publish(preset.base_image)
+
+    def close(self) -> None:
+        for handle in self._handles.values():
+            try:
+                os.remove(handle.path)
+            except OSError:
+                pass
+        self._handles.clear()
+
+    def __enter__(self) -> "SharedAssetStore":
+        return self
+
+    def __exit__(self, *_exc) -> None:
+        self.close()
+
+
+def render_preset(handle: SharedImageHandle, preset: SchedulePreset, texts: Sequence[str]) -> Image.Image:
+    """共有ベース画像の上にテロップを描いた画像を返す"""
+    out = handle.open_canvas()
+    for pos, text in zip(preset.positions, texts):
+        draw_telop(out, pos, text, preset.style)
+    return out
+
+
+_worker_handle: Optional[SharedImageHandle] = None
+
+
+def _init_worker(handle: SharedImageHandle) -> None:
+    global _worker_handle
+    _worker_handle = handle
+
+
+def _render_job(job: Tuple[SchedulePreset, Sequence[str], str]) -> str:
+    preset, texts, out_path = job
+    render_preset(_worker_handle, preset, texts).save(out_path)
+    return out_path
+
+
+def render_batch(preset: SchedulePreset, jobs: Sequence[Tuple[Sequence[str], str]],
+                 processes: Optional[int] = None) -> List[str]:
+    """(texts, 出力パス) の組を複数プロセスで描画する。ベース画像のデコードは一度だけ"""
+    with SharedAssetStore() as store:
+        handle = store.publish_preset(preset)
+        with Pool(processes, initializer=_init_worker, initargs=(handle,)) as pool:
+            return pool.map(_render_job, [(preset, texts, out) for texts, out in jobs])